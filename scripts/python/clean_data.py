@@ -2,48 +2,76 @@
 Simple data cleaning script to prepare data for testing
 This mimics the R cleaning script but in Python
 """
-import pandas as pd
+import polars as pl
+import calendar
 import os
 
 # Read raw data
 raw_data_path = "data/raw/sales_data.csv"
-processed_data_path = "data/processed/sales_data_cleaned.csv"
+processed_data_path = "data/processed/sales_data_cleaned.parquet"
 
-print("Loading raw data...")
-df = pd.read_csv(raw_data_path)
-print(f"Loaded {len(df)} raw records")
-
-# Convert date to datetime
-df['date'] = pd.to_datetime(df['date'])
-
-# Remove duplicates
-df = df.drop_duplicates()
+# Declared types let the CSV reader parse these columns (dates included)
+# directly instead of inferring them and converting afterwards
+raw_column_types = {
+    'date': pl.Datetime,
+    'sales_amount': pl.Float64,
+    'units_sold': pl.Int64,
+}
 
-# Remove records with missing critical fields
-df = df.dropna(subset=['date', 'sales_amount', 'units_sold', 'region', 'product_category'])
+# Month names looked up from the month number, so the date column is not
+# formatted row by row just to get the name
+month_names = {num: calendar.month_name[num] for num in range(1, 13)}
 
-# Remove negative values
-df = df[(df['sales_amount'] > 0) & (df['units_sold'] > 0)]
-
-# Add derived fields
-df['unit_price'] = df['sales_amount'] / df['units_sold']
-df['year'] = df['date'].dt.year
-df['month'] = df['date'].dt.month_name()
-df['month_num'] = df['date'].dt.month
-df['quarter'] = df['date'].dt.quarter
-df['week'] = df['date'].dt.isocalendar().week
+print("Loading raw data...")
+raw = pl.scan_csv(raw_data_path, schema_overrides=raw_column_types)
+print(f"Loaded {raw.select(pl.len()).collect().item()} raw records")
 
-# Standardize text fields
-df['region'] = df['region'].str.upper()
-df['product_category'] = df['product_category'].str.title()
+# Build the whole cleaning pipeline as one lazy query so Polars can
+# fuse the steps and run them in parallel
+df = (
+    raw
+    # Remove duplicates (maintain_order keeps the output reproducible)
+    .unique(keep='first', maintain_order=True)
+    # Remove records with missing critical fields
+    .drop_nulls(subset=['date', 'sales_amount', 'units_sold', 'region', 'product_category'])
+    # Remove negative values
+    .filter((pl.col('sales_amount') > 0) & (pl.col('units_sold') > 0))
+    # Sort by date while the frame is still narrow; derived fields are
+    # then computed in date order and never have to be moved
+    .sort('date', maintain_order=True)
+    # Add derived fields
+    .with_columns(
+        (pl.col('sales_amount') / pl.col('units_sold')).alias('unit_price'),
+        pl.col('date').dt.year().alias('year'),
+        pl.col('date').dt.month().replace_strict(month_names).alias('month'),
+        pl.col('date').dt.month().alias('month_num'),
+        pl.col('date').dt.quarter().alias('quarter'),
+        pl.col('date').dt.week().alias('week'),
+    )
+    # Narrow the integer columns now that values are known to be positive;
+    # sales amounts and prices stay float64 so totals keep exact cents
+    .cast({
+        'units_sold': pl.UInt32,
+        'year': pl.UInt16,
+        'month_num': pl.UInt8,
+        'quarter': pl.UInt8,
+        'week': pl.UInt8,
+    })
+    .collect(engine="streaming")
+)
 
-# Sort by date
-df = df.sort_values('date')
+# Standardize text fields on the distinct values only, then store them as
+# dictionary-encoded enums (sorted, so downstream groupbys keep A-Z order)
+for col, standardize in [('region', str.upper), ('product_category', str.title)]:
+    mapping = {value: standardize(value) for value in df[col].unique()}
+    categories = pl.Enum(sorted(set(mapping.values())))
+    df = df.with_columns(pl.col(col).replace_strict(mapping, return_dtype=categories))
 
 print(f"After cleaning: {len(df)} records")
 print(f"Date range: {df['date'].min()} to {df['date'].max()}")
 
-# Save cleaned data
+# Save cleaned data as Parquet so downstream scripts keep the dtypes
+# and can read back only the columns they need
 os.makedirs("data/processed", exist_ok=True)
-df.to_csv(processed_data_path, index=False)
+df.write_parquet(processed_data_path, compression="snappy")
 print(f"\nCleaned data saved to: {processed_data_path}")
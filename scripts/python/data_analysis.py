@@ -1,29 +1,51 @@
 """
 Business Analytics - Data Analysis Script (Python)
-Purpose: Perform statistical analysis on sales data using pandas
+Purpose: Perform statistical analysis on sales data using pandas and polars
 Author: Business Analytics Team
 Last Updated: 2024
 """
 
 import pandas as pd
 import numpy as np
+import polars as pl
 from datetime import datetime
+import calendar
 import os
 
 # Configuration
 RAW_DATA_PATH = "data/raw/sales_data.csv"
-PROCESSED_DATA_PATH = "data/processed/sales_data_cleaned.csv"
+PROCESSED_DATA_PATH = "data/processed/sales_data_cleaned.parquet"
 OUTPUT_PATH = "output/tables"
 
-def load_sales_data():
-    """Load cleaned sales data"""
+# Columns used by the analyses below; everything else stays on disk
+ANALYSIS_COLUMNS = [
+    'date', 'region', 'product_category', 'sales_rep', 'customer_id',
+    'sales_amount', 'units_sold', 'unit_price', 'month'
+]
+
+# Grouping keys stored as categoricals so groupby hashes integer codes
+CATEGORY_COLUMNS = ['region', 'product_category', 'sales_rep']
+
+# Ordered calendar categoricals, so groupby returns them in calendar order
+MONTH_DTYPE = pd.CategoricalDtype(list(calendar.month_name)[1:], ordered=True)
+DAY_OF_WEEK_DTYPE = pd.CategoricalDtype(list(calendar.day_name), ordered=True)
+
+def load_sales_data(columns=ANALYSIS_COLUMNS):
+    """Load cleaned sales data (only the requested columns)"""
     if not os.path.exists(PROCESSED_DATA_PATH):
         print(f"Error: Cleaned data not found at {PROCESSED_DATA_PATH}")
-        print("Please run R data_cleaning.R first or check the path.")
+        print("Please run scripts/python/clean_data.py first or check the path.")
         return None
     
-    df = pd.read_csv(PROCESSED_DATA_PATH)
-    df['date'] = pd.to_datetime(df['date'])
+    df = pd.read_parquet(PROCESSED_DATA_PATH, columns=columns)
+    # Only convert the columns that were actually loaded
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    if 'month' in df.columns:
+        df['month'] = df['month'].astype(MONTH_DTYPE)
+    if 'date' in df.columns:
+        df['day_of_week'] = df['date'].dt.day_name().astype(DAY_OF_WEEK_DTYPE)
     print(f"✓ Loaded {len(df)} records")
     return df
 
@@ -33,15 +55,29 @@ def calculate_kpis(df):
     print("KEY PERFORMANCE INDICATORS (KPIs)")
     print("="*60)
     
+    # All reductions in one Polars query, so each column is scanned once
+    # and the columns are reduced in parallel
+    stats = pl.from_pandas(df[['sales_amount', 'units_sold', 'customer_id', 'date']]).select(
+        pl.col('sales_amount').sum().alias('revenue'),
+        pl.col('sales_amount').mean().alias('avg_sale'),
+        pl.col('sales_amount').median().alias('median_sale'),
+        pl.col('units_sold').cast(pl.Int64).sum().alias('units'),
+        pl.col('units_sold').mean().alias('avg_units'),
+        pl.col('customer_id').n_unique().alias('customers'),
+        pl.col('date').min().alias('first_date'),
+        pl.col('date').max().alias('last_date'),
+        pl.len().alias('transactions')
+    ).row(0, named=True)
+    
     kpis = {
-        'Total Revenue': f"${df['sales_amount'].sum():,.2f}",
-        'Average Transaction Value': f"${df['sales_amount'].mean():,.2f}",
-        'Median Transaction Value': f"${df['sales_amount'].median():,.2f}",
-        'Total Units Sold': f"{df['units_sold'].sum():,}",
-        'Number of Transactions': f"{len(df):,}",
-        'Number of Unique Customers': f"{df['customer_id'].nunique():,}",
-        'Average Units per Transaction': f"{df['units_sold'].mean():.2f}",
-        'Date Range': f"{df['date'].min().strftime('%Y-%m-%d')} to {df['date'].max().strftime('%Y-%m-%d')}"
+        'Total Revenue': f"${stats['revenue']:,.2f}",
+        'Average Transaction Value': f"${stats['avg_sale']:,.2f}",
+        'Median Transaction Value': f"${stats['median_sale']:,.2f}",
+        'Total Units Sold': f"{stats['units']:,}",
+        'Number of Transactions': f"{stats['transactions']:,}",
+        'Number of Unique Customers': f"{stats['customers']:,}",
+        'Average Units per Transaction': f"{stats['avg_units']:.2f}",
+        'Date Range': f"{stats['first_date'].strftime('%Y-%m-%d')} to {stats['last_date'].strftime('%Y-%m-%d')}"
     }
     
     for key, value in kpis.items():
@@ -55,15 +91,14 @@ def analyze_by_region(df):
     print("REGIONAL ANALYSIS")
     print("="*60)
     
-    region_analysis = df.groupby('region').agg({
-        'sales_amount': ['sum', 'mean', 'count'],
-        'units_sold': 'sum',
-        'customer_id': 'nunique'
+    region_analysis = df.groupby('region', observed=True).agg(**{
+        'Total Sales': ('sales_amount', 'sum'),
+        'Avg Transaction': ('sales_amount', 'mean'),
+        'Num Transactions': ('sales_amount', 'count'),
+        'Total Units': ('units_sold', 'sum'),
+        'Unique Customers': ('customer_id', 'nunique')
     }).round(2)
     
-    region_analysis.columns = ['Total Sales', 'Avg Transaction', 'Num Transactions', 
-                                'Total Units', 'Unique Customers']
-    
     # Calculate market share
     region_analysis['Market Share %'] = (
         region_analysis['Total Sales'] / region_analysis['Total Sales'].sum() * 100
@@ -82,15 +117,14 @@ def analyze_by_category(df):
     print("PRODUCT CATEGORY ANALYSIS")
     print("="*60)
     
-    category_analysis = df.groupby('product_category').agg({
-        'sales_amount': ['sum', 'mean', 'count'],
-        'units_sold': 'sum',
-        'unit_price': 'mean'
+    category_analysis = df.groupby('product_category', observed=True).agg(**{
+        'Total Sales': ('sales_amount', 'sum'),
+        'Avg Transaction': ('sales_amount', 'mean'),
+        'Num Transactions': ('sales_amount', 'count'),
+        'Total Units': ('units_sold', 'sum'),
+        'Avg Unit Price': ('unit_price', 'mean')
     }).round(2)
     
-    category_analysis.columns = ['Total Sales', 'Avg Transaction', 'Num Transactions', 
-                                  'Total Units', 'Avg Unit Price']
-    
     # Calculate contribution percentage
     category_analysis['Revenue Contribution %'] = (
         category_analysis['Total Sales'] / category_analysis['Total Sales'].sum() * 100
@@ -108,13 +142,13 @@ def analyze_time_series(df):
     print("TIME SERIES ANALYSIS")
     print("="*60)
     
-    # Monthly aggregation
-    monthly = df.groupby('month').agg({
-        'sales_amount': ['sum', 'mean', 'count']
+    # Monthly aggregation (month is ordered January to December)
+    monthly = df.groupby('month', observed=True)['sales_amount'].agg(**{
+        'Total Sales': 'sum',
+        'Avg Transaction': 'mean',
+        'Num Transactions': 'count'
     }).round(2)
     
-    monthly.columns = ['Total Sales', 'Avg Transaction', 'Num Transactions']
-    
     # Calculate growth rates
     monthly['Growth %'] = monthly['Total Sales'].pct_change() * 100
     monthly['Growth %'] = monthly['Growth %'].round(2)
@@ -122,14 +156,12 @@ def analyze_time_series(df):
     print("\nMonthly Performance:")
     print(monthly.to_string())
     
-    # Weekly patterns
-    df['day_of_week'] = df['date'].dt.day_name()
-    weekly = df.groupby('day_of_week')['sales_amount'].agg(['sum', 'mean', 'count'])
-    weekly.columns = ['Total Sales', 'Avg Transaction', 'Num Transactions']
-    
-    # Reorder days
-    day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-    weekly = weekly.reindex([day for day in day_order if day in weekly.index])
+    # Weekly patterns (day_of_week is ordered Monday to Sunday)
+    weekly = df.groupby('day_of_week', observed=True)['sales_amount'].agg(**{
+        'Total Sales': 'sum',
+        'Avg Transaction': 'mean',
+        'Num Transactions': 'count'
+    })
     
     print("\nWeekly Pattern (by day of week):")
     print(weekly.to_string())
@@ -142,13 +174,13 @@ def analyze_sales_reps(df):
     print("SALES REPRESENTATIVE PERFORMANCE")
     print("="*60)
     
-    rep_analysis = df.groupby('sales_rep').agg({
-        'sales_amount': ['sum', 'mean', 'count'],
-        'customer_id': 'nunique'
+    rep_analysis = df.groupby('sales_rep', observed=True).agg(**{
+        'Total Sales': ('sales_amount', 'sum'),
+        'Avg Sale': ('sales_amount', 'mean'),
+        'Num Sales': ('sales_amount', 'count'),
+        'Unique Customers': ('customer_id', 'nunique')
     }).round(2)
     
-    rep_analysis.columns = ['Total Sales', 'Avg Sale', 'Num Sales', 'Unique Customers']
-    
     # Calculate performance metrics
     rep_analysis['Sales per Customer'] = (
         rep_analysis['Total Sales'] / rep_analysis['Unique Customers']
@@ -178,7 +210,11 @@ def generate_summary_statistics(df):
     
     # Correlation analysis
     numeric_cols = ['sales_amount', 'units_sold', 'unit_price']
-    correlation = df[numeric_cols].corr().round(3)
+    # The cleaned columns have no missing values, so one np.corrcoef pass over
+    # the stacked array matches DataFrame.corr()'s pairwise computation
+    values = df[numeric_cols].to_numpy(dtype=float)
+    correlation = pd.DataFrame(np.corrcoef(values, rowvar=False),
+                               index=numeric_cols, columns=numeric_cols).round(3)
     
     print("\nCorrelation Matrix:")
     print(correlation.to_string())
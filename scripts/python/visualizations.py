@@ -6,10 +6,13 @@ Last Updated: 2024
 """
 
 import pandas as pd
+import matplotlib
+matplotlib.use('Agg')  # files only, no GUI backend needed
 import matplotlib.pyplot as plt
 import seaborn as sns
 import numpy as np
 from matplotlib.patches import Rectangle
+from concurrent.futures import ProcessPoolExecutor
 import os
 
 # Set style for professional-looking charts
@@ -20,7 +23,7 @@ plt.rcParams['axes.titlesize'] = 14
 plt.rcParams['axes.titleweight'] = 'bold'
 
 # Configuration
-PROCESSED_DATA_PATH = "data/processed/sales_data_cleaned.csv"
+PROCESSED_DATA_PATH = "data/processed/sales_data_cleaned.parquet"
 OUTPUT_PATH = "output/figures"
 
 # Color palette
@@ -32,29 +35,30 @@ COLORS = {
     'warning': '#F77F00'
 }
 
-def load_data():
-    """Load cleaned sales data"""
+def load_data(columns=None, verbose=True):
+    """Load cleaned sales data (all columns, or only the requested ones)"""
     if not os.path.exists(PROCESSED_DATA_PATH):
         print(f"Error: Cleaned data not found at {PROCESSED_DATA_PATH}")
-        print("Please run R data_cleaning.R first.")
+        print("Please run scripts/python/clean_data.py first.")
         return None
     
-    df = pd.read_csv(PROCESSED_DATA_PATH)
-    df['date'] = pd.to_datetime(df['date'])
-    print(f"✓ Loaded {len(df)} records for visualization")
+    df = pd.read_parquet(PROCESSED_DATA_PATH, columns=columns)
+    if verbose:
+        print(f"✓ Loaded {len(df)} records for visualization")
     return df
 
+def moving_average(values, window):
+    """Trailing moving average; the first window-1 points average what is available"""
+    totals = np.cumsum(values, dtype=float)
+    totals[window:] = totals[window:] - totals[:-window]
+    return totals / np.minimum(np.arange(1, len(totals) + 1), window)
+
 def plot_revenue_heatmap(df):
     """Create heatmap of revenue by region and category"""
     fig, ax = plt.subplots(figsize=(10, 6))
     
     # Pivot data
-    heatmap_data = df.pivot_table(
-        values='sales_amount',
-        index='region',
-        columns='product_category',
-        aggfunc='sum'
-    )
+    heatmap_data = df.groupby(['region', 'product_category'], observed=True)['sales_amount'].sum().unstack()
     
     # Create heatmap
     sns.heatmap(heatmap_data, annot=True, fmt=',.0f', cmap='YlOrRd',
@@ -99,9 +103,13 @@ def plot_time_series_advanced(df):
     """Create advanced time series visualization"""
     fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 10))
     
+    # One grouped pass over the frame feeds both panels: a column per category,
+    # NaN on days a category had no sales
+    daily_by_category = df.groupby(['date', 'product_category'], observed=True)['sales_amount'].sum().unstack()
+    
     # Daily sales with moving average
-    daily_sales = df.groupby('date')['sales_amount'].sum().reset_index()
-    daily_sales['MA_7'] = daily_sales['sales_amount'].rolling(window=7, min_periods=1).mean()
+    daily_sales = daily_by_category.sum(axis=1).rename('sales_amount').reset_index()
+    daily_sales['MA_7'] = moving_average(daily_sales['sales_amount'].to_numpy(), 7)
     
     ax1.plot(daily_sales['date'], daily_sales['sales_amount'], 
              color=COLORS['primary'], alpha=0.5, linewidth=1, label='Daily Sales')
@@ -116,10 +124,10 @@ def plot_time_series_advanced(df):
     ax1.grid(True, alpha=0.3)
     ax1.tick_params(axis='x', rotation=45)
     
-    # Cumulative sales by category
+    # Cumulative sales by category (each line keeps only its own days)
+    cumulative_by_category = daily_by_category.cumsum()
     for category in df['product_category'].unique():
-        cat_data = df[df['product_category'] == category].sort_values('date')
-        cumulative = cat_data.groupby('date')['sales_amount'].sum().cumsum()
+        cumulative = cumulative_by_category[category].dropna()
         ax2.plot(cumulative.index, cumulative.values, linewidth=2.5, 
                 label=category, marker='o', markersize=3)
     
@@ -138,9 +146,9 @@ def plot_regional_comparison(df):
     fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(14, 10))
     
     # 1. Total sales by region (bar chart)
-    region_sales = df.groupby('region')['sales_amount'].sum().sort_values(ascending=True)
-    colors_bar = [COLORS['primary'] if x == region_sales.max() else COLORS['secondary'] 
-                  for x in region_sales]
+    region_sales = df.groupby('region', observed=True)['sales_amount'].sum().sort_values(ascending=True)
+    colors_bar = np.where(region_sales.values == region_sales.max(),
+                          COLORS['primary'], COLORS['secondary']).tolist()
     region_sales.plot(kind='barh', ax=ax1, color=colors_bar, alpha=0.8)
     ax1.set_xlabel('Total Sales ($)', fontweight='bold')
     ax1.set_ylabel('Region', fontweight='bold')
@@ -148,11 +156,11 @@ def plot_regional_comparison(df):
     ax1.grid(True, alpha=0.3, axis='x')
     
     # Add value labels
-    for i, v in enumerate(region_sales.values):
-        ax1.text(v + 1000, i, f'${v:,.0f}', va='center', fontweight='bold')
+    ax1.bar_label(ax1.containers[0], labels=[f'${v:,.0f}' for v in region_sales.values],
+                  padding=3, fontweight='bold')
     
     # 2. Average transaction value by region
-    region_avg = df.groupby('region')['sales_amount'].mean().sort_values(ascending=True)
+    region_avg = df.groupby('region', observed=True)['sales_amount'].mean().sort_values(ascending=True)
     region_avg.plot(kind='barh', ax=ax2, color=COLORS['accent'], alpha=0.8)
     ax2.set_xlabel('Average Transaction ($)', fontweight='bold')
     ax2.set_ylabel('Region', fontweight='bold')
@@ -160,15 +168,14 @@ def plot_regional_comparison(df):
     ax2.grid(True, alpha=0.3, axis='x')
     
     # 3. Number of transactions by region (pie chart)
-    region_count = df.groupby('region').size()
+    region_count = df.groupby('region', observed=True).size()
     colors_pie = [COLORS['primary'], COLORS['secondary'], COLORS['accent'], COLORS['success']]
     ax3.pie(region_count.values, labels=region_count.index, autopct='%1.1f%%',
             startangle=90, colors=colors_pie, textprops={'fontweight': 'bold'})
     ax3.set_title('Transaction Distribution by Region', pad=15)
     
     # 4. Sales by region and month (stacked bar)
-    region_month = df.pivot_table(values='sales_amount', index='month_num', 
-                                    columns='region', aggfunc='sum')
+    region_month = df.groupby(['month_num', 'region'], observed=True)['sales_amount'].sum().unstack()
     region_month.plot(kind='bar', stacked=True, ax=ax4, 
                       color=[COLORS['primary'], COLORS['secondary'], 
                             COLORS['accent'], COLORS['success']], alpha=0.8)
@@ -189,7 +196,7 @@ def plot_category_performance(df):
     
     # 1. Revenue by category
     ax1 = fig.add_subplot(gs[0, :])
-    category_revenue = df.groupby('product_category').agg({
+    category_revenue = df.groupby('product_category', observed=True).agg({
         'sales_amount': 'sum',
         'units_sold': 'sum'
     }).sort_values('sales_amount', ascending=False)
@@ -220,7 +227,7 @@ def plot_category_performance(df):
     
     # 2. Unit price analysis
     ax2 = fig.add_subplot(gs[1, 0])
-    category_price = df.groupby('product_category')['unit_price'].agg(['mean', 'min', 'max'])
+    category_price = df.groupby('product_category', observed=True)['unit_price'].agg(['mean', 'min', 'max'])
     category_price.plot(kind='bar', ax=ax2, color=[COLORS['primary'], COLORS['secondary'], COLORS['accent']], 
                         alpha=0.8)
     ax2.set_xlabel('Product Category', fontweight='bold')
@@ -232,8 +239,9 @@ def plot_category_performance(df):
     
     # 3. Category trend over time
     ax3 = fig.add_subplot(gs[1, 1])
+    daily_by_category = df.groupby(['date', 'product_category'], observed=True)['sales_amount'].sum().unstack()
     for category in df['product_category'].unique():
-        cat_daily = df[df['product_category'] == category].groupby('date')['sales_amount'].sum()
+        cat_daily = daily_by_category[category].dropna()
         ax3.plot(cat_daily.index, cat_daily.values, linewidth=2, label=category, marker='o', markersize=2)
     ax3.set_xlabel('Date', fontweight='bold')
     ax3.set_ylabel('Daily Sales ($)', fontweight='bold')
@@ -244,8 +252,7 @@ def plot_category_performance(df):
     
     # 4. Category mix by region
     ax4 = fig.add_subplot(gs[2, :])
-    category_region = df.pivot_table(values='sales_amount', index='region', 
-                                      columns='product_category', aggfunc='sum')
+    category_region = df.groupby(['region', 'product_category'], observed=True)['sales_amount'].sum().unstack()
     category_region_pct = category_region.div(category_region.sum(axis=1), axis=0) * 100
     category_region_pct.plot(kind='bar', stacked=True, ax=ax4, 
                               color=[COLORS['primary'], COLORS['secondary'], COLORS['accent']], 
@@ -259,36 +266,53 @@ def plot_category_performance(df):
     
     return fig
 
+# Output file name -> (plot function, columns it reads)
+PLOTS = {
+    'revenue_heatmap_py.png': (
+        plot_revenue_heatmap, ['region', 'product_category', 'sales_amount']),
+    'sales_distribution_py.png': (
+        plot_sales_distribution, ['product_category', 'sales_amount']),
+    'time_series_advanced_py.png': (
+        plot_time_series_advanced, ['date', 'product_category', 'sales_amount']),
+    'regional_comparison_py.png': (
+        plot_regional_comparison, ['region', 'month_num', 'sales_amount']),
+    'category_performance_py.png': (
+        plot_category_performance,
+        ['date', 'region', 'product_category', 'sales_amount', 'units_sold', 'unit_price'])
+}
+
+def render_plot(filename):
+    """Load the plot's columns, then draw and save one figure (runs in a worker process)"""
+    plot_func, columns = PLOTS[filename]
+    try:
+        df = load_data(columns, verbose=False)
+        fig = plot_func(df)
+        filepath = os.path.join(OUTPUT_PATH, filename)
+        fig.savefig(filepath, dpi=150, bbox_inches='tight', facecolor='white',
+                    pil_kwargs={'optimize': False, 'compress_level': 1})
+        plt.close(fig)
+        return f"✓ Saved: {filename}"
+    except Exception as e:
+        return f"✗ Error creating {filename}: {str(e)}"
+
 def save_all_visualizations():
     """Generate and save all visualizations"""
     os.makedirs(OUTPUT_PATH, exist_ok=True)
     
-    # Load data
-    df = load_data()
-    if df is None:
+    # Check the data once here; each worker then reads the Parquet file itself
+    # rather than receiving a pickled copy of the frame
+    if not os.path.exists(PROCESSED_DATA_PATH):
+        print(f"Error: Cleaned data not found at {PROCESSED_DATA_PATH}")
+        print("Please run scripts/python/clean_data.py first.")
         return
     
     print("\nGenerating Python visualizations...")
     print("="*60)
     
-    # Generate and save plots
-    plots = {
-        'revenue_heatmap_py.png': plot_revenue_heatmap,
-        'sales_distribution_py.png': plot_sales_distribution,
-        'time_series_advanced_py.png': plot_time_series_advanced,
-        'regional_comparison_py.png': plot_regional_comparison,
-        'category_performance_py.png': plot_category_performance
-    }
-    
-    for filename, plot_func in plots.items():
-        try:
-            fig = plot_func(df)
-            filepath = os.path.join(OUTPUT_PATH, filename)
-            fig.savefig(filepath, dpi=300, bbox_inches='tight', facecolor='white')
-            plt.close(fig)
-            print(f"✓ Saved: {filename}")
-        except Exception as e:
-            print(f"✗ Error creating {filename}: {str(e)}")
+    # The figures are independent, so render them in parallel processes
+    with ProcessPoolExecutor(max_workers=len(PLOTS)) as executor:
+        for status in executor.map(render_plot, PLOTS):
+            print(status)
     
     print(f"\nAll visualizations saved to {OUTPUT_PATH}/")
     print("="*60)